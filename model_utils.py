@@ -0,0 +1,37 @@
+"""
+Shared model-conversion helpers for the GUI predictor and the offline
+quantize/prune scripts. Kept free of GUI imports and import-time side
+effects so the headless scripts don't inherit the app's thread limits
+or tkinter dependency.
+"""
+
+import tensorflow as tf
+
+
+def strip_training_ops(model):
+    """
+    Rebuild a Sequential model without training-only layers (Dropout) so
+    the converted graph carries no dead inference ops. BatchNorm folding
+    and conv+ReLU fusion are left to the TFLite converter, which performs
+    them automatically during conversion.
+    """
+    if not isinstance(model, tf.keras.Sequential):
+        return model
+    layers = [
+        layer for layer in model.layers
+        if not isinstance(layer, tf.keras.layers.Dropout)
+    ]
+    if len(layers) == len(model.layers):
+        return model
+    return tf.keras.Sequential(layers)
+
+
+def with_rescaling(model):
+    """
+    Wrap `model` so the 1/255 normalization happens inside the graph.
+    The converted model then takes raw 0-255 pixel values and the divide
+    runs in fused interpreter kernels instead of a per-call numpy pass.
+    """
+    inputs = tf.keras.Input(shape=(30, 30, 3))
+    outputs = strip_training_ops(model)(tf.keras.layers.Rescaling(1.0 / 255)(inputs))
+    return tf.keras.Model(inputs, outputs)
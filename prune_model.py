@@ -0,0 +1,74 @@
+import numpy as np
+import os
+import sys
+import tensorflow as tf
+
+from traffic import load_data
+from model_utils import with_rescaling
+
+EPOCHS = 3
+TARGET_SPARSITY = 0.5
+
+
+def main():
+
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python prune_model.py model.h5 data_directory")
+
+    try:
+        import tensorflow_model_optimization as tfmot
+    except ImportError:
+        sys.exit(
+            "tensorflow-model-optimization is required: "
+            "pip install tensorflow-model-optimization"
+        )
+
+    model_path, data_dir = sys.argv[1], sys.argv[2]
+    model = tf.keras.models.load_model(model_path)
+
+    images, labels = load_data(data_dir)
+    # Build float32 directly; dividing the uint8 array would promote the
+    # whole dataset to float64 first
+    x = np.array(images, dtype=np.float32) / np.float32(255.0)
+    y = tf.keras.utils.to_categorical(labels)
+
+    # Plain magnitude pruning, then fine-tune to recover accuracy. The
+    # Dense(128) layer holds most of this model's weights, so that is
+    # where the size win comes from. Note XNNPACK's sparse inference
+    # kernels only cover 1x1 convs, so the 3x3 convs here still run
+    # dense at inference time; the pruned model is smaller on disk but
+    # not proportionally faster.
+    pruned = tfmot.sparsity.keras.prune_low_magnitude(
+        model,
+        pruning_schedule=tfmot.sparsity.keras.PolynomialDecay(
+            initial_sparsity=0.0,
+            final_sparsity=TARGET_SPARSITY,
+            begin_step=0,
+            end_step=(len(x) // 32) * EPOCHS,
+        ),
+    )
+    pruned.compile(
+        optimizer="adam",
+        loss="categorical_crossentropy",
+        metrics=["accuracy"]
+    )
+    pruned.fit(
+        x, y,
+        epochs=EPOCHS,
+        callbacks=[tfmot.sparsity.keras.UpdatePruningStep()]
+    )
+    pruned.evaluate(x, y, verbose=2)
+
+    stripped = tfmot.sparsity.keras.strip_pruning(pruned)
+    converter = tf.lite.TFLiteConverter.from_keras_model(with_rescaling(stripped))
+    converter.optimizations = [tf.lite.Optimize.EXPERIMENTAL_SPARSITY]
+    tflite_model = converter.convert()
+
+    output_path = os.path.splitext(model_path)[0] + "_sparse.tflite"
+    with open(output_path, "wb") as f:
+        f.write(tflite_model)
+    print(f"Sparse model saved to {output_path}.")
+
+
+if __name__ == "__main__":
+    main()
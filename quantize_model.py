@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+import os
+import sys
+import tensorflow as tf
+
+from model_utils import with_rescaling
+
+IMG_WIDTH = 30
+IMG_HEIGHT = 30
+NUM_SAMPLES = 100
+
+
+def main():
+
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python quantize_model.py model.h5 data_directory")
+
+    model_path, data_dir = sys.argv[1], sys.argv[2]
+    model = tf.keras.models.load_model(model_path)
+
+    # Match the predictor's runtime contract: raw 0-255 pixels in,
+    # normalization inside the graph.
+    converter = tf.lite.TFLiteConverter.from_keras_model(with_rescaling(model))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: representative_dataset(data_dir)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    tflite_model = converter.convert()
+
+    output_path = os.path.splitext(model_path)[0] + "_int8.tflite"
+    with open(output_path, "wb") as f:
+        f.write(tflite_model)
+    print(f"Quantized model saved to {output_path}.")
+
+
+def representative_dataset(data_dir):
+    """
+    Yield up to NUM_SAMPLES preprocessed training images so the converter
+    can calibrate int8 quantization ranges. Assume `data_dir` is laid out
+    like the training data for traffic.py: one numbered directory per
+    category containing image files.
+    """
+    count = 0
+    for category in sorted(os.listdir(data_dir)):
+        category_path = os.path.join(data_dir, category)
+        if not os.path.isdir(category_path):
+            continue
+        for image_name in os.listdir(category_path):
+            if count >= NUM_SAMPLES:
+                return
+            image = cv2.imread(os.path.join(category_path, image_name))
+            if image is None:
+                continue
+            image = cv2.resize(image, (IMG_WIDTH, IMG_HEIGHT))
+            yield [np.expand_dims(image, axis=0).astype(np.float32)]
+            count += 1
+
+
+if __name__ == "__main__":
+    main()